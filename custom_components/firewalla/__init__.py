@@ -7,24 +7,25 @@ from __future__ import annotations
 
 import logging
 import asyncio
-from datetime import timedelta
-from typing import Any, Dict, List, Mapping, Optional
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Any, Dict, FrozenSet, List, Optional
 
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, ServiceCall, callback
 from homeassistant.const import (
     CONF_API_KEY,
     CONF_HOST,
-    CONF_NAME,
+    CONF_SCAN_INTERVAL,
     Platform,
 )
 from homeassistant.exceptions import ConfigEntryNotReady
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
     DataUpdateCoordinator,
     UpdateFailed,
 )
@@ -34,6 +35,10 @@ from .const import (
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
     FIREWALLA_COORDINATOR,
+    FIREWALLA_NETWORK_COORDINATOR,
+    MAX_NETWORK_SCAN_INTERVAL,
+    NETWORK_SCAN_INTERVAL,
+    RULE_REFRESH_DELAY,
     SERVICE_PAUSE_RULE,
     SERVICE_RESUME_RULE,
 )
@@ -42,6 +47,9 @@ _LOGGER = logging.getLogger(__name__)
 
 SCAN_INTERVAL = timedelta(seconds=DEFAULT_SCAN_INTERVAL)
 
+# Fields every box needs for its entities' device info
+_REQUIRED_BOX_FIELDS = ("gid", "name", "model", "version")
+
 CONFIG_SCHEMA = vol.Schema(
     {
         DOMAIN: vol.Schema(
@@ -56,10 +64,19 @@ CONFIG_SCHEMA = vol.Schema(
 
 PLATFORMS = [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.SWITCH]
 
+RULE_ID_SCHEMA = vol.Schema(
+    {
+        vol.Required("rule_id"): vol.All(
+            cv.ensure_list, [vol.All(cv.string, vol.Length(min=1))]
+        )
+    }
+)
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Firewalla component."""
     hass.data.setdefault(DOMAIN, {})
+    register_services(hass)
     return True
 
 
@@ -71,69 +88,108 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     session = async_get_clientsession(hass)
     api = FirewallaAPI(session, host, api_key)
 
-    # Test API connection
-    try:
-        devices = await api.get_devices()
-        if not devices:
-            raise ConfigEntryNotReady("No Firewalla devices found")
-    except Exception as ex:
-        raise ConfigEntryNotReady(f"Cannot connect to Firewalla API: {ex}") from ex
-
-    coordinator = FirewallaDataUpdateCoordinator(hass, api)
+    scan_interval = entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+    coordinator = FirewallaDataUpdateCoordinator(
+        hass, api, timedelta(seconds=scan_interval)
+    )
+    # The first refresh doubles as the connection test
     await coordinator.async_config_entry_first_refresh()
+    if not coordinator.data or not coordinator.data["devices"]:
+        raise ConfigEntryNotReady("No Firewalla devices found")
+
+    # Network devices are optional, so a failed first refresh doesn't block setup
+    network_coordinator = FirewallaNetworkCoordinator(hass, api, coordinator)
+    await network_coordinator.async_refresh()
 
     hass.data[DOMAIN][entry.entry_id] = {
         FIREWALLA_COORDINATOR: coordinator,
+        FIREWALLA_NETWORK_COORDINATOR: network_coordinator,
     }
 
-    # Register services
-    register_services(hass, api, coordinator)
+    entry.async_on_unload(coordinator.async_cancel_delayed_refresh)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Reload when the options (e.g. scan interval) change
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     return True
 
 
-def register_services(
-    hass: HomeAssistant, 
-    api: FirewallaAPI, 
-    coordinator: FirewallaDataUpdateCoordinator
-) -> None:
-    """Register integration services."""
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+def register_services(hass: HomeAssistant) -> None:
+    """Register integration services.
+    
+    Services are registered once for the integration and dispatched to the
+    config entry that owns the rule.
+    """
+    if hass.services.has_service(DOMAIN, SERVICE_PAUSE_RULE):
+        return
+    
+    async def set_rule_paused(rule_id: str, paused: bool) -> None:
+        """Pause or resume a rule on the Firewalla entry that owns it."""
+        coordinators: List[FirewallaDataUpdateCoordinator] = [
+            entry_data[FIREWALLA_COORDINATOR]
+            for entry_data in hass.data[DOMAIN].values()
+        ]
+        
+        # Prefer the entries that know the rule, otherwise try all of them
+        owners = [
+            coordinator
+            for coordinator in coordinators
+            if coordinator.data and rule_id in coordinator.data["rules_by_id"]
+        ]
+        
+        for coordinator in owners or coordinators:
+            if paused:
+                success = await coordinator.api.pause_rule(rule_id)
+            else:
+                success = await coordinator.api.resume_rule(rule_id)
+                
+            if success:
+                # Patch the cached rule instead of re-polling every box
+                coordinator.async_set_rule_paused(rule_id, paused)
+                coordinator.async_request_delayed_refresh()
+                return
+                
+        _LOGGER.error("Failed to %s rule: %s", "pause" if paused else "resume", rule_id)
     
     async def pause_rule(call: ServiceCall) -> None:
-        """Pause a rule."""
-        rule_id = call.data.get("rule_id")
-        if not rule_id:
+        """Pause one or more rules."""
+        rule_ids = call.data["rule_id"]
+        if not rule_ids:
             _LOGGER.error("No rule_id provided to pause_rule service")
             return
         
-        await api.pause_rule(rule_id)
-        await coordinator.async_request_refresh()
+        # Send the requests together; the follow-up refreshes coalesce into one
+        await asyncio.gather(*(set_rule_paused(rule_id, True) for rule_id in rule_ids))
     
     async def resume_rule(call: ServiceCall) -> None:
-        """Resume a rule."""
-        rule_id = call.data.get("rule_id")
-        if not rule_id:
+        """Resume one or more rules."""
+        rule_ids = call.data["rule_id"]
+        if not rule_ids:
             _LOGGER.error("No rule_id provided to resume_rule service")
             return
         
-        await api.resume_rule(rule_id)
-        await coordinator.async_request_refresh()
+        await asyncio.gather(*(set_rule_paused(rule_id, False) for rule_id in rule_ids))
     
     # Register the services
     hass.services.async_register(
         DOMAIN, 
         SERVICE_PAUSE_RULE, 
         pause_rule, 
-        vol.Schema({vol.Required("rule_id"): cv.string})
+        RULE_ID_SCHEMA,
     )
     
     hass.services.async_register(
         DOMAIN, 
         SERVICE_RESUME_RULE, 
         resume_rule, 
-        vol.Schema({vol.Required("rule_id"): cv.string})
+        RULE_ID_SCHEMA,
     )
 
 
@@ -148,94 +204,326 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 class FirewallaDataUpdateCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
     """Class to manage fetching Firewalla data."""
 
-    def __init__(self, hass: HomeAssistant, api: FirewallaAPI) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: FirewallaAPI,
+        update_interval: timedelta = SCAN_INTERVAL,
+    ) -> None:
         """Initialize the coordinator."""
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=SCAN_INTERVAL,
+            update_interval=update_interval,
+            # Skip listener callbacks when a poll returns identical data
+            always_update=False,
         )
         self.api = api
         self.devices: List[Dict[str, Any]] = []
         self.rules: List[Dict[str, Any]] = []
-        self.network_devices: List[Dict[str, Any]] = []
-        self.device_groups: Dict[str, str] = {}  # Map group IDs to group names
+        self._unsub_delayed_refresh: Optional[CALLBACK_TYPE] = None
+        # IDs of the rules last ignored for not matching a box
+        self._dropped_rule_ids: FrozenSet[str] = frozenset()
+        # GIDs of the boxes last ignored for missing a required field
+        self._dropped_box_ids: FrozenSet[str] = frozenset()
+
+    @callback
+    def async_request_delayed_refresh(self) -> None:
+        """Schedule one refresh shortly after a burst of rule changes.
+        
+        Calls made while a refresh is already scheduled are coalesced into it.
+        """
+        if self._unsub_delayed_refresh is None:
+            self._unsub_delayed_refresh = async_call_later(
+                self.hass, RULE_REFRESH_DELAY, self._async_delayed_refresh
+            )
+
+    @callback
+    def async_cancel_delayed_refresh(self) -> None:
+        """Cancel a pending delayed refresh."""
+        if self._unsub_delayed_refresh is not None:
+            self._unsub_delayed_refresh()
+            self._unsub_delayed_refresh = None
+
+    async def _async_delayed_refresh(self, _now: datetime) -> None:
+        """Refresh data after the coalescing window closed."""
+        self._unsub_delayed_refresh = None
+        await self.async_request_refresh()
+
+    @callback
+    def async_set_rule_paused(self, rule_id: str, paused: bool) -> None:
+        """Update the cached state of a rule and notify listeners.
+        
+        The rule is replaced with a patched copy rather than changed in place.
+        The API client hands back the same parsed objects for an unchanged
+        response, so the next poll still compares the box's actual state
+        against this optimistic one.
+        """
+        if not self.data:
+            return
+            
+        rule = self.data["rules_by_id"].get(rule_id)
+        if rule is None:
+            return
+            
+        patched = {
+            **rule,
+            "status": "paused" if paused else "active",
+            "paused": paused,
+        }
+        
+        def swap(rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            return [patched if item is rule else item for item in rules]
+            
+        self.rules = swap(self.data["rules"])
+        self.async_set_updated_data(
+            {
+                **self.data,
+                "rules": self.rules,
+                "rules_by_id": {**self.data["rules_by_id"], rule_id: patched},
+                "active_rules": swap(self.data["active_rules"]),
+            }
+        )
+
+    async def _async_fetch_rules(
+        self, gids: List[str], rules: Optional[List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Assign the unfiltered rules to boxes, fetching per box if that failed."""
+        if rules is not None:
+            # With a single box, a rule without a gid can only belong to it
+            only_gid = gids[0] if len(gids) == 1 else None
+            
+            # The unfiltered request covers every box, group client-side by gid
+            rules_by_gid: Dict[Any, List[Dict[str, Any]]] = {}
+            for rule in rules:
+                gid = rule.get("gid")
+                if not gid and only_gid:
+                    gid = only_gid
+                    rule = {**rule, "gid": gid}
+                rules_by_gid.setdefault(gid, []).append(rule)
+                
+            assigned = [rule for gid in gids for rule in rules_by_gid.pop(gid, [])]
+            self._log_dropped_rules(
+                [rule for dropped in rules_by_gid.values() for rule in dropped]
+            )
+            return assigned
+            
+        _LOGGER.debug("Unfiltered rules request failed, falling back to per-device requests")
+        
+        rule_results = await asyncio.gather(
+            *(self.api.get_rules(gid) for gid in gids), return_exceptions=True
+        )
+        all_rules: List[Dict[str, Any]] = []
+        for gid, device_rules in zip(gids, rule_results):
+            if isinstance(device_rules, Exception):
+                _LOGGER.error("Error fetching rules for device %s: %s", gid, device_rules)
+            elif device_rules is None:
+                _LOGGER.error("Failed to fetch rules for device %s", gid)
+            else:
+                # Rules fetched for a box belong to it even without a gid
+                all_rules.extend(
+                    rule if rule.get("gid") else {**rule, "gid": gid}
+                    for rule in device_rules
+                )
+                
+        return all_rules
+
+    def _log_dropped_rules(self, dropped: List[Dict[str, Any]]) -> None:
+        """Warn about rules that match no box, once per change in the set."""
+        dropped_ids = frozenset(str(rule.get("id", "unknown")) for rule in dropped)
+        if dropped_ids == self._dropped_rule_ids:
+            return
+            
+        self._dropped_rule_ids = dropped_ids
+        if dropped_ids:
+            _LOGGER.warning(
+                "Ignoring %d rules without a GID or for an unknown box: %s",
+                len(dropped),
+                ", ".join(sorted(dropped_ids)),
+            )
+
+    def _log_dropped_boxes(self, dropped: List[Dict[str, Any]]) -> None:
+        """Warn about boxes missing a required field, once per change in the set."""
+        dropped_ids = frozenset(str(device.get("gid") or "unknown") for device in dropped)
+        if dropped_ids == self._dropped_box_ids:
+            return
+            
+        self._dropped_box_ids = dropped_ids
+        if dropped_ids:
+            _LOGGER.warning(
+                "Ignoring %d boxes missing one of %s: %s",
+                len(dropped),
+                ", ".join(_REQUIRED_BOX_FIELDS),
+                ", ".join(sorted(dropped_ids)),
+            )
 
     async def _async_update_data(self) -> Dict[str, Any]:
         """Fetch data from Firewalla."""
         try:
-            # Get devices first - this is critical for all other functionality
-            devices = await self.api.get_devices()
+            # Boxes and rules don't depend on each other, fetch them together
+            devices, rules = await self.api.fetch_all()
+            # Validate once here so entities can build their device info
+            # without guarding each box
+            valid_devices = []
+            dropped_devices = []
+            for device in devices:
+                if device.get("gid") and all(
+                    field in device for field in _REQUIRED_BOX_FIELDS
+                ):
+                    valid_devices.append(device)
+                else:
+                    dropped_devices.append(device)
+            self._log_dropped_boxes(dropped_devices)
+            devices = valid_devices
+            # Devices are critical for all other functionality
             if not devices:
                 raise UpdateFailed("Failed to fetch Firewalla devices")
                 
-            # Ensure devices is a list of dictionaries
-            if isinstance(devices, str):
-                _LOGGER.error("Received unexpected string response for devices: %s", devices)
-                raise UpdateFailed("Unexpected response format from API")
-                
             self.devices = devices
             
-            # Get rules for all devices - this is critical for rule switches
-            all_rules: List[Dict[str, Any]] = []
-            for device in devices:
-                device_gid = device.get("gid")
-                if not device_gid:
-                    continue
-                    
-                device_rules = await self.api.get_rules(device_gid)
-                if device_rules:
-                    # Ensure rules is a list of dictionaries
-                    if isinstance(device_rules, list):
-                        all_rules.extend(device_rules)
-                    else:
-                        _LOGGER.error("Received unexpected format for rules: %s", type(device_rules))
+            gids = [device["gid"] for device in devices]
+
+            all_rules = await self._async_fetch_rules(gids, rules)
             
+            # Keep a stable order so unchanged polls compare equal
+            all_rules.sort(key=lambda rule: str(rule.get("id", "")))
+            
+            # Cached responses hand back the very same dicts, which compare by
+            # identity first, so an unchanged poll is cheap to detect. Reusing
+            # the previous result skips rebuilding the indexes below.
+            previous = self.data
+            if (
+                previous is not None
+                and devices == previous["devices"]
+                and all_rules == previous["rules"]
+            ):
+                return previous
+                
             self.rules = all_rules
             
             # Initial data structure with critical components
             result: Dict[str, Any] = {
                 "devices": devices,
                 "rules": all_rules,
+                # Indexes so entities can look up their data without scanning
+                "devices_by_gid": {device["gid"]: device for device in devices},
+                # Keyed by the string form, as entities and services use it
+                "rules_by_id": {
+                    str(rule["id"]): rule for rule in all_rules if rule.get("id")
+                },
+                # Disabled rules get no switch, so setup only walks these
+                "active_rules": [
+                    rule for rule in all_rules if not rule.get("disabled", False)
+                ],
+                "online_gids": frozenset(
+                    device["gid"] for device in devices if device.get("online", False)
+                ),
             }
             
-            # Try to get network devices, but don't fail if this part doesn't work
-            # For now we're just collecting the data, but not creating entities from it
-            try:
-                all_network_devices: List[Dict[str, Any]] = []
-                for device in devices:
-                    device_gid = device.get("gid")
-                    if not device_gid:
-                        continue
-                        
-                    network_devices = await self.api.get_network_devices(device_gid)
-                    if network_devices:
-                        all_network_devices.extend(network_devices)
-                
-                self.network_devices = all_network_devices
-                
-                # Build a map of group IDs to group names
-                self.device_groups = {}
-                for device in all_network_devices:
-                    if "group" in device and isinstance(device["group"], dict):
-                        group_id = device["group"].get("id")
-                        group_name = device["group"].get("name")
-                        if group_id and group_name:
-                            self.device_groups[group_id] = group_name
-                
-                # Add network device data to result if available - just for data collection
-                # We're not creating entities from this data yet
-                result["network_devices"] = all_network_devices
-                result["device_groups"] = self.device_groups
-                
-                _LOGGER.debug("Successfully retrieved network devices: %d devices, %d groups", 
-                             len(all_network_devices), len(self.device_groups))
-            except Exception as ex:
-                _LOGGER.warning("Error retrieving network devices, continuing without them: %s", ex)
-                # Don't re-raise - we want to continue even if network devices fail
-            
             return result
         except Exception as ex:
             _LOGGER.error("Error updating Firewalla data: %s", ex)
             raise UpdateFailed(f"Error communicating with Firewalla API: {ex}") from ex
+
+
+class FirewallaNetworkCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
+    """Class to manage fetching network devices connected to the Firewalla boxes.
+    
+    The set of LAN devices changes slowly, so it is polled on its own,
+    longer interval instead of on every rule refresh. The interval doubles
+    after each poll that returns unchanged data, up to an hour, and drops
+    back to the base interval as soon as something changes.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: FirewallaAPI,
+        device_coordinator: FirewallaDataUpdateCoordinator,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_network_devices",
+            update_interval=NETWORK_SCAN_INTERVAL,
+            always_update=False,
+        )
+        self.api = api
+        self.device_coordinator = device_coordinator
+        self.network_devices: List[Dict[str, Any]] = []
+        self.device_groups: Dict[str, str] = {}  # Map group IDs to group names
+
+    async def _async_update_data(self) -> Dict[str, Any]:
+        """Fetch network devices for every known Firewalla box."""
+        gids = [device["gid"] for device in self.device_coordinator.devices]
+        
+        network_results = await asyncio.gather(
+            *(self.api.get_network_devices(gid) for gid in gids),
+            return_exceptions=True,
+        )
+        
+        for gid, network_devices in zip(gids, network_results):
+            if isinstance(network_devices, Exception):
+                _LOGGER.warning(
+                    "Error fetching network devices for device %s: %s",
+                    gid,
+                    network_devices,
+                )
+        
+        all_network_devices: List[Dict[str, Any]] = list(
+            chain.from_iterable(
+                devices
+                for devices in network_results
+                if not isinstance(devices, Exception)
+            )
+        )
+        # Keep a stable order so unchanged polls compare equal
+        all_network_devices.sort(key=lambda device: str(device.get("id", "")))
+        
+        self.network_devices = all_network_devices
+        
+        # Build a map of group IDs to group names
+        self.device_groups = {
+            group["id"]: group["name"]
+            for device in all_network_devices
+            if isinstance(group := device.get("group"), dict)
+            and group.get("id")
+            and group.get("name")
+        }
+        
+        _LOGGER.debug("Successfully retrieved network devices: %d devices, %d groups", 
+                     len(all_network_devices), len(self.device_groups))
+        
+        result = {
+            "network_devices": all_network_devices,
+            "device_groups": self.device_groups,
+            # Index so sensors can look up their device without scanning
+            "network_devices_by_id": {
+                device["id"]: device
+                for device in all_network_devices
+                if device.get("id")
+            },
+        }
+        result["known_network_ids"] = frozenset(result["network_devices_by_id"])
+        self._adjust_update_interval(result)
+        
+        return result
+
+    def _adjust_update_interval(self, result: Dict[str, Any]) -> None:
+        """Back off polling while the network devices stay unchanged.
+        
+        Runs before the new result is stored, so self.data is still the
+        previous poll. The coordinator schedules its next refresh after this
+        one finishes, which picks up the new interval, as long as the rule
+        switches are listening.
+        """
+        if self.data is not None and result == self.data:
+            interval = min(self.update_interval * 2, MAX_NETWORK_SCAN_INTERVAL)
+        else:
+            interval = NETWORK_SCAN_INTERVAL
+            
+        if interval != self.update_interval:
+            _LOGGER.debug("Network devices poll interval is now %s", interval)
+            self.update_interval = interval
@@ -1,23 +1,92 @@
 """Firewalla API client."""
+import asyncio
+import functools
+import hashlib
 import logging
-from typing import Any, Dict, List, Optional, Union
-from urllib.parse import urlparse
+import time
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
 import aiohttp
+from aiohttp import hdrs
+from multidict import CIMultiDict
+from yarl import URL
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # orjson ships with Home Assistant, but keep a fallback
+    import json
+
+    _json_loads = json.loads
 
 from .api_utils import (
     parse_devices_response,
     parse_network_devices_response,
     parse_rules_response,
 )
+from .const import (
+    ERROR_LOG_INTERVAL,
+    MAX_CONCURRENT_REQUESTS,
+    MAX_RETRIES,
+    RETRY_BACKOFF,
+)
 from .logger import log_api_error, log_exception
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+
+def _safe_api(
+    message: str, default: Callable[[], _T]
+) -> Callable[[Callable[..., Awaitable[_T]]], Callable[..., Awaitable[_T]]]:
+    """Log and swallow errors raised by an API method, returning a default.
+    
+    Args:
+        message: Log message, formatted with the method's arguments
+        default: Factory for the value returned when the call fails
+    """
+    def decorator(func: Callable[..., Awaitable[_T]]) -> Callable[..., Awaitable[_T]]:
+        @functools.wraps(func)
+        async def wrapper(self: "FirewallaAPI", *args: Any, **kwargs: Any) -> _T:
+            try:
+                return await func(self, *args, **kwargs)
+            except Exception as ex:
+                log_exception(_LOGGER, message.format(*args, **kwargs), ex)
+                return default()
+        return wrapper
+    return decorator
+
 
 class FirewallaAPI:
     """Firewalla API Client."""
 
+    __slots__ = (
+        "session",
+        "host",
+        "api_key",
+        "base_url",
+        "headers",
+        "_urls",
+        "_semaphore",
+        "_cache",
+        "_inflight",
+        "_last_error",
+    )
+
     def __init__(self, session: aiohttp.ClientSession, host: str, api_key: str):
         """Initialize the API client.
         
@@ -30,131 +99,277 @@ class FirewallaAPI:
         self.host = host
         self.api_key = api_key
         self.base_url = f"https://{host}"
-        self.headers = {"Authorization": f"Token {api_key}"}
+        # Built once in aiohttp's own header type so requests don't convert it
+        self.headers = CIMultiDict(
+            {
+                hdrs.AUTHORIZATION: f"Token {api_key}",
+                hdrs.ACCEPT: "application/json",
+            }
+        )
+        # Endpoint URLs are parsed once and reused for the client's lifetime
+        base = URL(self.base_url)
+        self._urls = {
+            "devices": base / "v2" / "boxes",
+            "network_devices": base / "v2" / "devices",
+            "rules": base / "v2" / "rules",
+        }
+        # Shared across all calls so concurrent refreshes don't hammer the box
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        # Map URLs to their last (conditional headers, body digest, parsed body)
+        self._cache: Dict[URL, Tuple[Dict[str, str], Optional[bytes], Any]] = {}
+        # Requests currently in flight, keyed by URL
+        self._inflight: Dict[URL, asyncio.Future] = {}
+        # When each (status, endpoint) error was last logged
+        self._last_error: Dict[Tuple[int, str], float] = {}
+
+    @asynccontextmanager
+    async def _request(
+        self, method: str, url: URL, headers: Optional[Mapping[str, str]] = None
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send a request to the API, bounded by the shared concurrency limit.
+        
+        Transient failures are retried with exponential backoff. Each attempt
+        takes its own slot, so waiting between attempts doesn't hold up other
+        calls.
+        """
+        headers = headers or self.headers
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                response = await self._send(
+                    method, url, headers, can_retry=attempt < MAX_RETRIES
+                )
+                if response is not None:
+                    try:
+                        yield response
+                    finally:
+                        response.release()
+                    return
+                    
+            await asyncio.sleep(RETRY_BACKOFF * 2**attempt)
+            attempt += 1
+
+    async def _send(
+        self, method: str, url: URL, headers: Mapping[str, str], can_retry: bool
+    ) -> Optional[aiohttp.ClientResponse]:
+        """Send a single attempt, returning None if it should be retried.
+        
+        A connection that could not be opened is retried for any method, as
+        the request never reached the API. Other client errors, timeouts and
+        5xx responses are only retried for GET requests, since a pause or
+        resume may already have been applied. Any other response, including
+        4xx errors such as an invalid token, is returned straight away.
+        """
+        idempotent = method == hdrs.METH_GET
+        try:
+            response = await self.session.request(method, url, headers=headers)
+        except aiohttp.ClientConnectorError as ex:
+            if not can_retry:
+                raise
+            _LOGGER.debug("Could not connect for %s, retrying: %s", url, ex)
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            if not (can_retry and idempotent):
+                raise
+            _LOGGER.debug("Request to %s failed, retrying: %s", url, ex)
+            return None
+            
+        if response.status >= 500 and can_retry and idempotent:
+            _LOGGER.debug("Request to %s returned %s, retrying", url, response.status)
+            response.release()
+            return None
+            
+        return response
 
+    async def _log_api_error(
+        self, endpoint: str, response: aiohttp.ClientResponse
+    ) -> None:
+        """Log a failed API call, suppressing repeats of the same error.
+        
+        The response body is only read when the error is actually logged.
+        """
+        if not _LOGGER.isEnabledFor(logging.ERROR):
+            return
+            
+        key = (response.status, endpoint)
+        now = time.monotonic()
+        last = self._last_error.get(key)
+        if last is not None and now - last < ERROR_LOG_INTERVAL:
+            return
+            
+        # Forget errors that are no longer suppressed, so per-rule endpoints
+        # don't accumulate
+        self._last_error = {
+            error: logged
+            for error, logged in self._last_error.items()
+            if now - logged < ERROR_LOG_INTERVAL
+        }
+        self._last_error[key] = now
+        log_api_error(_LOGGER, endpoint, response.status, await response.text())
+
+    async def _get_json(self, endpoint: str, url: URL) -> Any:
+        """Perform a GET request, sharing the result with concurrent callers.
+        
+        If a request for the same URL is already in flight, wait for its
+        result instead of sending a duplicate request.
+        """
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_json(endpoint, url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+            
+        # Shield so a cancelled caller doesn't cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def _fetch_json(self, endpoint: str, url: URL) -> Any:
+        """Perform a conditional GET request and return the decoded JSON body.
+        
+        Responses carrying an ETag or Last-Modified header are cached per URL,
+        so a 304 Not Modified reply reuses the previously parsed body instead
+        of downloading it again. Without either header, a digest of the raw
+        body is kept instead, so an unchanged body is at least not re-parsed.
+        
+        Args:
+            endpoint: The API endpoint, used for error logging
+            url: The full URL to request
+            
+        Returns:
+            The decoded JSON body, or None if the request failed. The same
+            object may be returned again for an unchanged response, so
+            callers must treat it as read-only.
+        """
+        headers = self.headers
+        cached = self._cache.get(url)
+        if cached and cached[0]:
+            headers = self.headers.copy()
+            headers.update(cached[0])
+            
+        async with self._request("GET", url, headers) as response:
+            if response.status == 304 and cached:
+                _LOGGER.debug("Not modified, reusing cached response for %s", url)
+                return cached[2]
+                
+            # A non-JSON body (e.g. an HTML error page) isn't worth parsing
+            if response.status != 200 or "json" not in (response.content_type or ""):
+                await self._log_api_error(endpoint, response)
+                return None
+                
+            body = await response.read()
+            
+            conditional_headers = {}
+            if etag := response.headers.get("ETag"):
+                conditional_headers["If-None-Match"] = etag
+            if last_modified := response.headers.get("Last-Modified"):
+                conditional_headers["If-Modified-Since"] = last_modified
+                
+            digest = None
+            if not conditional_headers:
+                digest = hashlib.blake2b(body, digest_size=16).digest()
+                if cached and cached[1] == digest:
+                    _LOGGER.debug("Body unchanged, reusing cached response for %s", url)
+                    return cached[2]
+                    
+            # Decode straight from the raw bytes, skipping the str round-trip
+            try:
+                data = _json_loads(body)
+            except ValueError as ex:
+                log_exception(_LOGGER, f"Invalid JSON from {endpoint}", ex)
+                return None
+            self._cache[url] = (conditional_headers, digest, data)
+            
+            return data
+
+    @_safe_api("Failed to get Firewalla devices", list)
     async def get_devices(self) -> List[Dict[str, Any]]:
         """Get Firewalla devices."""
         endpoint = "/v2/boxes"
-        url = f"{self.base_url}{endpoint}"
-        try:
-            async with self.session.get(url, headers=self.headers) as response:
-                if response.status != 200:
-                    response_text = await response.text()
-                    log_api_error(_LOGGER, endpoint, response.status, response_text)
-                    return []
-                    
-                data = await response.json()
-                _LOGGER.debug("Devices API response received")
-                
-                return parse_devices_response(data)
-        except Exception as ex:
-            log_exception(_LOGGER, "Failed to get Firewalla devices", ex)
+        url = self._urls["devices"]
+        data = await self._get_json(endpoint, url)
+        if data is None:
             return []
             
+        _LOGGER.debug("Devices API response received")
+        
+        return parse_devices_response(data)
+            
+    @_safe_api("Failed to get network devices", list)
     async def get_network_devices(self, device_gid: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get network devices from Firewalla."""
         endpoint = "/v2/devices"
-        url = f"{self.base_url}{endpoint}"
+        url = self._urls["network_devices"]
         if device_gid:
-            url = f"{url}?gid={device_gid}"
+            url = url.with_query(gid=device_gid)
             
         _LOGGER.debug("Fetching network devices from: %s", url)
             
-        try:
-            async with self.session.get(url, headers=self.headers) as response:
-                response_text = await response.text()
-                _LOGGER.debug("Network devices response status: %s", response.status)
-                
-                if response.status != 200:
-                    log_api_error(_LOGGER, endpoint, response.status, response_text)
-                    return []
-                    
-                try:
-                    data = await response.json()
-                    return parse_network_devices_response(data)
-                except Exception as ex:
-                    log_exception(
-                        _LOGGER, 
-                        "Error parsing network devices response", 
-                        ex, 
-                        logging.ERROR
-                    )
-                    return []
-        except Exception as ex:
-            log_exception(_LOGGER, "Failed to get network devices", ex)
+        data = await self._get_json(endpoint, url)
+        if data is None:
             return []
             
-    async def get_rules(self, device_gid: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get rules from Firewalla."""
+        return parse_network_devices_response(data)
+            
+    @_safe_api("Failed to get rules", lambda: None)
+    async def get_rules(
+        self, device_gid: Optional[str] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Get rules from Firewalla.
+        
+        Returns None if the request failed, so callers can tell a failure
+        apart from an account without rules.
+        """
         endpoint = "/v2/rules"
-        url = f"{self.base_url}{endpoint}"
+        url = self._urls["rules"]
         if device_gid:
-            url = f"{url}?gid={device_gid}"
+            url = url.with_query(gid=device_gid)
             
-        try:
-            async with self.session.get(url, headers=self.headers) as response:
-                if response.status != 200:
-                    response_text = await response.text()
-                    log_api_error(_LOGGER, endpoint, response.status, response_text)
-                    return []
-                    
-                data = await response.json()
-                _LOGGER.debug("Rules API response for device %s", device_gid)
-                
-                # Use the utility function to parse the rules response
-                return parse_rules_response(data)
-        except Exception as ex:
-            log_exception(_LOGGER, "Failed to get rules", ex)
-            return []
+        data = await self._get_json(endpoint, url)
+        if data is None:
+            return None
+            
+        _LOGGER.debug("Rules API response for device %s", device_gid)
+        
+        # Use the utility function to parse the rules response
+        return parse_rules_response(data)
+            
+    async def fetch_all(
+        self,
+    ) -> Tuple[List[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+        """Fetch the boxes and the unfiltered rules list concurrently.
+        
+        Returns:
+            A (devices, rules) tuple; devices is empty and rules is None if
+            the respective request failed
+        """
+        devices, rules = await asyncio.gather(self.get_devices(), self.get_rules())
+        return devices, rules
             
+    @_safe_api("Failed to pause rule {}", bool)
     async def pause_rule(self, rule_id: str) -> bool:
         """Pause a rule."""
         endpoint = f"/v2/rules/{rule_id}/pause"
-        url = f"{self.base_url}{endpoint}"
-        try:
-            async with self.session.post(url, headers=self.headers) as response:
-                response_text = await response.text()
-                _LOGGER.debug("Pause rule response: %s - %s", response.status, response_text)
+        url = self._urls["rules"] / rule_id / "pause"
+        async with self._request("POST", url) as response:
+            _LOGGER.debug("Pause rule response status: %s", response.status)
+            
+            if response.status != 200:
+                await self._log_api_error(endpoint, response)
+                return False
                 
-                if response.status != 200:
-                    log_api_error(_LOGGER, endpoint, response.status, response_text)
-                    return False
-                    
-                # Try to parse the response
-                try:
-                    data = await response.json()
-                    _LOGGER.debug("Pause rule response data: %s", data)
-                    return True
-                except Exception as json_ex:
-                    # If we can't parse JSON but got a 200, consider it success
-                    _LOGGER.debug("Could not parse JSON response for pause rule, but got 200 status")
-                    return True
-        except Exception as ex:
-            log_exception(_LOGGER, f"Failed to pause rule {rule_id}", ex)
-            return False
+            # The body carries nothing we need, a 200 is success
+            return True
             
+    @_safe_api("Failed to resume rule {}", bool)
     async def resume_rule(self, rule_id: str) -> bool:
         """Resume a rule."""
         endpoint = f"/v2/rules/{rule_id}/resume"
-        url = f"{self.base_url}{endpoint}"
-        try:
-            async with self.session.post(url, headers=self.headers) as response:
-                response_text = await response.text()
-                _LOGGER.debug("Resume rule response: %s - %s", response.status, response_text)
+        url = self._urls["rules"] / rule_id / "resume"
+        async with self._request("POST", url) as response:
+            _LOGGER.debug("Resume rule response status: %s", response.status)
+            
+            if response.status != 200:
+                await self._log_api_error(endpoint, response)
+                return False
                 
-                if response.status != 200:
-                    log_api_error(_LOGGER, endpoint, response.status, response_text)
-                    return False
-                    
-                # Try to parse the response
-                try:
-                    data = await response.json()
-                    _LOGGER.debug("Resume rule response data: %s", data)
-                    return True
-                except Exception as json_ex:
-                    # If we can't parse JSON but got a 200, consider it success
-                    _LOGGER.debug("Could not parse JSON response for resume rule, but got 200 status")
-                    return True
-        except Exception as ex:
-            log_exception(_LOGGER, f"Failed to resume rule {rule_id}", ex)
-            return False
\ No newline at end of file
+            # The body carries nothing we need, a 200 is success
+            return True
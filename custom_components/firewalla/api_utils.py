@@ -1,10 +1,20 @@
 """Utility functions for Firewalla API response parsing."""
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _filter_dicts(items: List[Any], kind: str) -> List[Dict[str, Any]]:
+    """Drop malformed entries so callers can rely on a list of dictionaries."""
+    valid = [item for item in items if isinstance(item, dict)]
+    if len(valid) != len(items):
+        _LOGGER.warning(
+            "Ignoring %d malformed %s entries", len(items) - len(valid), kind
+        )
+    return valid
+
+
 def parse_devices_response(data: Any) -> List[Dict[str, Any]]:
     """Parse API response for devices into a standardized format.
     
@@ -19,7 +29,7 @@ def parse_devices_response(data: Any) -> List[Dict[str, Any]]:
         _LOGGER.error("Expected list of devices but got: %s", type(data))
         return []
         
-    return data
+    return _filter_dicts(data, "device")
 
 
 def parse_network_devices_response(data: Any) -> List[Dict[str, Any]]:
@@ -31,20 +41,21 @@ def parse_network_devices_response(data: Any) -> List[Dict[str, Any]]:
     Returns:
         A list of network device dictionaries
     """
-    # Log data statistics
-    device_count = len(data) if isinstance(data, list) else "unknown"
-    _LOGGER.debug("Received %s network devices", device_count)
-    
-    # Log a sample of the data if available
-    if isinstance(data, list) and len(data) > 0:
-        _LOGGER.debug("Sample network device: %s", data[0])
-    
     # Ensure we have a list
     if not isinstance(data, list):
         _LOGGER.error("Expected list of network devices but got: %s", type(data))
         return []
         
-    return data
+    # Log data statistics and a sample, only when someone is listening
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug(
+            "Received %d network devices, sample: %s",
+            len(data),
+            data[0] if data else None,
+        )
+        
+    return _filter_dicts(data, "network device")
+
 
 def parse_rules_response(data: Any) -> List[Dict[str, Any]]:
     """Parse API response for rules into a standardized format.
@@ -58,56 +69,69 @@ def parse_rules_response(data: Any) -> List[Dict[str, Any]]:
     Returns:
         A list of rule dictionaries
     """
-    # Log the structure of the data to help debug
+    return _filter_dicts(_extract_rules(data), "rule")
+
+
+def _extract_rules(data: Any) -> List[Any]:
+    """Extract the raw list of rules from any of the known response formats."""
+    # Fast path for the formats the v2 API actually returns
+    if isinstance(data, list):
+        return data
     if isinstance(data, dict):
+        rules = data.get("rules")
+        if isinstance(rules, list):
+            return rules
+        return _extract_rules_slow(data)
+        
+    _LOGGER.error("Unexpected rules data format: %s", type(data))
+    return []
+
+
+def _extract_rules_slow(data: Dict[str, Any]) -> List[Any]:
+    """Search a dictionary response of unknown shape for the list of rules."""
+    # Log the structure of the data to help debug
+    if _LOGGER.isEnabledFor(logging.DEBUG):
         _LOGGER.debug("Dictionary keys in rules response: %s", list(data.keys()))
     
-    # Handle various formats of responses
-    if isinstance(data, dict):
-        # Try to find the rules in the dictionary, checking common keys
-        for key in ["rules", "data", "items", "results"]:
-            if key in data and isinstance(data[key], list):
-                _LOGGER.debug("Found rules under key '%s'", key)
-                return data[key]
-        
-        # If we didn't find a known key but have a single array value, use that
-        for key, value in data.items():
-            if isinstance(value, list) and len(value) > 0 and isinstance(value[0], dict):
-                _LOGGER.debug("Using list value from key '%s' as rules", key)
-                return value
+    # Try to find the rules in the dictionary, checking common keys
+    for key in ("data", "items", "results"):
+        if isinstance(data.get(key), list):
+            _LOGGER.debug("Found rules under key '%s'", key)
+            return data[key]
+    
+    # If we didn't find a known key but have a single array value, use that
+    for key, value in data.items():
+        if isinstance(value, list) and len(value) > 0 and isinstance(value[0], dict):
+            _LOGGER.debug("Using list value from key '%s' as rules", key)
+            return value
+    
+    # If we couldn't find any list to use, convert the dictionary to rules if possible
+    # This handles the case where the dictionary itself represents the rules
+    _LOGGER.debug("Converting dictionary to rule list")
+    result = []
+    for key, value in data.items():
+        if isinstance(value, dict) and "id" in value:
+            # This looks like a rule item
+            result.append(value)
+        elif key.startswith("rule_") and isinstance(value, dict):
+            rule = value.copy()
+            rule["id"] = key
+            result.append(rule)
+    
+    if result:
+        _LOGGER.debug("Converted %d dictionary entries to rules", len(result))
+        return result
         
-        # If we couldn't find any list to use, convert the dictionary to rules if possible
-        # This handles the case where the dictionary itself represents the rules
-        _LOGGER.debug("Converting dictionary to rule list")
-        result = []
-        for key, value in data.items():
-            if isinstance(value, dict) and "id" in value:
-                # This looks like a rule item
-                result.append(value)
-            elif key.startswith("rule_") and isinstance(value, dict):
-                rule = value.copy()
-                rule["id"] = key
-                result.append(rule)
+    # As a last resort, treat the whole dictionary as a single rule
+    if "id" in data or "target" in data or "action" in data:
+        _LOGGER.debug("Treating whole dictionary as a single rule")
+        # Ensure the rule has an ID
+        if "id" not in data and "gid" in data:
+            rule_copy = data.copy()
+            rule_copy["id"] = f"rule_{data['gid']}"
+            return [rule_copy]
+        return [data]
         
-        if result:
-            _LOGGER.debug("Converted %d dictionary entries to rules", len(result))
-            return result
-        else:
-            # As a last resort, treat the whole dictionary as a single rule
-            if "id" in data or "target" in data or "action" in data:
-                _LOGGER.debug("Treating whole dictionary as a single rule")
-                # Ensure the rule has an ID
-                if "id" not in data and "gid" in data:
-                    rule_copy = data.copy()
-                    rule_copy["id"] = f"rule_{data['gid']}"
-                    return [rule_copy]
-                return [data]
-            
+    if _LOGGER.isEnabledFor(logging.ERROR):
         _LOGGER.error("Could not extract rules from dictionary: %s", data)
-        return []
-    elif isinstance(data, list):
-        # If it's already a list, use it directly
-        return data
-    else:
-        _LOGGER.error("Unexpected rules data format: %s", type(data))
-        return []
\ No newline at end of file
+    return []
@@ -2,14 +2,13 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
@@ -34,27 +33,14 @@ async def async_setup_entry(
         _LOGGER.error("No devices data available in coordinator")
         return
     
-    entities = []
-    
     # Log the data structure for debugging
     _LOGGER.debug("Devices data structure: %s", coordinator.data["devices"])
     
-    for device_data in coordinator.data["devices"]:
-        # Ensure device_data is a dictionary
-        if not isinstance(device_data, dict):
-            _LOGGER.error("Unexpected device data format: %s", type(device_data))
-            continue
-            
-        # Add online status binary sensor
-        try:
-            entities.append(
-                FirewallaOnlineSensor(
-                    coordinator=coordinator,
-                    device_data=device_data,
-                )
-            )
-        except Exception as ex:
-            _LOGGER.error("Error creating FirewallaOnlineSensor: %s", ex)
+    # Online status binary sensor for each box
+    entities = [
+        FirewallaOnlineSensor(coordinator=coordinator, device_data=device_data)
+        for device_data in coordinator.data["devices"]
+    ]
 
     async_add_entities(entities)
 
@@ -69,11 +55,13 @@ class FirewallaOnlineSensor(FirewallaBaseEntity, BinarySensorEntity):
         super().__init__(coordinator, device_data)
         self._attr_unique_id = f"{self.gid}_{ENTITY_ONLINE}"
         self._attr_name = f"{device_data['name']} Online"
+        self._attr_is_on = device_data.get("online", False)
 
-    @property
-    def is_on(self) -> bool:
-        """Return true if the Firewalla is online."""
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update the online state once per coordinator refresh."""
         device_data = self.get_device_data()
-        if device_data:
-            return device_data.get("online", False)
-        return False
+        self._attr_is_on = (
+            device_data.get("online", False) if device_data else False
+        )
+        super()._handle_coordinator_update()
@@ -1,9 +1,11 @@
 """Constants for the Firewalla integration."""
+from datetime import timedelta
 from typing import Final
 
 # Integration Constants
 DOMAIN: Final = "firewalla"
 FIREWALLA_COORDINATOR: Final = "coordinator"
+FIREWALLA_NETWORK_COORDINATOR: Final = "network_coordinator"
 
 # Device Attributes
 ATTR_GID: Final = "gid"
@@ -47,4 +49,13 @@ SERVICE_PAUSE_RULE: Final = "pause_rule"
 SERVICE_RESUME_RULE: Final = "resume_rule"
 
 # Default Values
-DEFAULT_SCAN_INTERVAL: Final = 60  # seconds
+DEFAULT_SCAN_INTERVAL: Final = 120  # seconds
+MIN_SCAN_INTERVAL: Final = 30  # seconds
+MAX_SCAN_INTERVAL: Final = 3600  # seconds
+NETWORK_SCAN_INTERVAL: Final = timedelta(minutes=10)
+MAX_NETWORK_SCAN_INTERVAL: Final = timedelta(hours=1)
+RULE_REFRESH_DELAY: Final = 0.25  # seconds
+MAX_CONCURRENT_REQUESTS: Final = 4
+ERROR_LOG_INTERVAL: Final = 30  # seconds between repeats of the same API error
+MAX_RETRIES: Final = 2
+RETRY_BACKOFF: Final = 0.5  # seconds, doubled on each retry
@@ -2,8 +2,12 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
 from typing import Any, Dict, Optional
 
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
@@ -14,7 +18,6 @@ from .const import (
     ATTR_MODE,
     ATTR_MODEL,
     ATTR_PUBLIC_IP,
-    ATTR_RULE_ID,
     ATTR_VERSION,
     DOMAIN,
     ENTITY_RULE,
@@ -22,8 +25,87 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
+# Translation tables for building synthetic and entity-safe rule IDs
+_SYNTHETIC_ID_TRANS = str.maketrans(" ", "_")
+_SAFE_ID_TRANS = str.maketrans("-", "_")
 
-class FirewallaBaseEntity(CoordinatorEntity):
+# Box fields needed to describe the device in the registry. The coordinator
+# drops boxes missing any of them, so entities read them without guards.
+_DEVICE_INFO_FIELDS = itemgetter("gid", "name", "model", "version")
+
+# Box fields exposed as state attributes, as (source key, attribute) pairs.
+# The core fields are present on every box and are extracted in one call.
+_CORE_ATTR_MAP = (
+    ("gid", ATTR_GID),
+    ("model", ATTR_MODEL),
+    ("version", ATTR_VERSION),
+    ("mode", ATTR_MODE),
+    ("license", ATTR_LICENSE),
+)
+_CORE_ATTRS = tuple(attr for _, attr in _CORE_ATTR_MAP)
+_CORE_FIELDS = itemgetter(*(key for key, _ in _CORE_ATTR_MAP))
+_OPTIONAL_ATTR_MAP = (
+    ("publicIP", ATTR_PUBLIC_IP),
+    ("location", ATTR_LOCATION),
+)
+
+
+@lru_cache(maxsize=4096)
+def timestamp_to_iso(timestamp: float) -> str:
+    """Convert a Unix timestamp to an ISO 8601 string, caching the result.
+    
+    Timestamps only change on a coordinator refresh, so attribute reads
+    mostly hit the cache.
+    """
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+@lru_cache(maxsize=64)
+def box_device_info(gid: str, name: str, model: str, version: str) -> DeviceInfo:
+    """Return the registry description of a box, shared by all its entities."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, gid)},
+        name=name,
+        manufacturer="Firewalla",
+        model=model.capitalize(),
+        sw_version=version,
+        configuration_url=f"https://my.firewalla.com/app/box/{gid}",
+    )
+
+
+@lru_cache(maxsize=1024)
+def network_device_info(device_id: str, name: str, vendor: str, gid: str) -> DeviceInfo:
+    """Return the registry description of a network device behind a box."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, device_id)},
+        name=name,
+        manufacturer=vendor,
+        via_device=(DOMAIN, gid),
+        model="Network Device",
+    )
+
+
+class WriteOnChangeMixin:
+    """Skip coordinator-driven state writes that would not change anything.
+    
+    Must come before CoordinatorEntity in the bases. Subclasses update their
+    _attr_* values and then call super()._handle_coordinator_update().
+    """
+
+    _last_written: Optional[tuple] = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if it differs from the last one written."""
+        snapshot = (self.available, self.state, self.extra_state_attributes)
+        if snapshot == self._last_written:
+            return
+            
+        self._last_written = snapshot
+        self.async_write_ha_state()
+
+
+class FirewallaBaseEntity(WriteOnChangeMixin, CoordinatorEntity):
     """Base entity class for Firewalla entities."""
 
     def __init__(self, coordinator, device_data):
@@ -35,15 +117,13 @@ class FirewallaBaseEntity(CoordinatorEntity):
         """
         super().__init__(coordinator)
         self.device_data = device_data
-        self.gid = device_data["gid"]
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, self.gid)},
-            name=device_data["name"],
-            manufacturer="Firewalla",
-            model=device_data["model"].capitalize(),
-            sw_version=device_data["version"],
-            configuration_url=f"https://my.firewalla.com/app/box/{self.gid}",
-        )
+        fields = _DEVICE_INFO_FIELDS(device_data)
+        self.gid = fields[0]
+        self._attr_device_info = box_device_info(*fields)
+        # Attributes built from the device dict they were last computed for,
+        # seeded now so the first state write finds them cached
+        self._attributes_source: Optional[Dict[str, Any]] = device_data
+        self._attributes: Dict[str, Any] = self._build_attributes(device_data)
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
@@ -52,32 +132,38 @@ class FirewallaBaseEntity(CoordinatorEntity):
         if not current_data:
             return {}
             
-        attributes = {
-            ATTR_GID: current_data["gid"],
-            ATTR_MODEL: current_data["model"],
-            ATTR_VERSION: current_data["version"],
-            ATTR_MODE: current_data["mode"],
-            ATTR_LICENSE: current_data["license"],
-        }
-
-        if "publicIP" in current_data:
-            attributes[ATTR_PUBLIC_IP] = current_data["publicIP"]
+        # Device dicts are replaced, never mutated, so identity tracks changes
+        if current_data is not self._attributes_source:
+            self._attributes = self._build_attributes(current_data)
+            self._attributes_source = current_data
             
-        if "location" in current_data:
-            attributes[ATTR_LOCATION] = current_data["location"]
+        return self._attributes
+
+    @staticmethod
+    def _build_attributes(current_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the attributes for the given box data."""
+        try:
+            attributes = dict(zip(_CORE_ATTRS, _CORE_FIELDS(current_data)))
+        except KeyError:
+            # Tolerate a box that lacks one of the core fields
+            attributes = {
+                attr: current_data[key]
+                for key, attr in _CORE_ATTR_MAP
+                if key in current_data
+            }
             
+        for key, attr in _OPTIONAL_ATTR_MAP:
+            if key in current_data:
+                attributes[attr] = current_data[key]
+                
         return attributes
 
     def get_device_data(self) -> Optional[Dict[str, Any]]:
         """Get the current device data from coordinator."""
-        if not self.coordinator.data or "devices" not in self.coordinator.data:
+        if not self.coordinator.data:
             return None
             
-        for device in self.coordinator.data["devices"]:
-            if device["gid"] == self.gid:
-                return device
-                
-        return None
+        return self.coordinator.data.get("devices_by_gid", {}).get(self.gid)
 
     @property
     def available(self) -> bool:
@@ -88,7 +174,7 @@ class FirewallaBaseEntity(CoordinatorEntity):
         return self.get_device_data() is not None
 
 
-class FirewallaRuleEntity(CoordinatorEntity):
+class FirewallaRuleEntity(WriteOnChangeMixin, CoordinatorEntity):
     """Base entity class for Firewalla rule entities."""
 
     def __init__(self, coordinator, rule, device_data):
@@ -101,11 +187,10 @@ class FirewallaRuleEntity(CoordinatorEntity):
         """
         super().__init__(coordinator)
         self.rule = rule
-        self.device_data = device_data
         
         # Get rule ID, falling back to creating one if missing
         if "id" in rule:
-            self.rule_id = rule["id"]
+            self.rule_id = str(rule["id"])
         else:
             # Create a synthetic ID based on other rule properties
             rule_type = rule.get("type", "")
@@ -114,66 +199,52 @@ class FirewallaRuleEntity(CoordinatorEntity):
                 target_value = rule_target.get("value", "unknown")
             else:
                 target_value = str(rule_target)
-            self.rule_id = f"rule_{rule_type}_{target_value}".replace(" ", "_").lower()
+            self.rule_id = f"rule_{rule_type}_{target_value}".translate(_SYNTHETIC_ID_TRANS).lower()
             _LOGGER.warning("Rule missing ID, created synthetic ID: %s", self.rule_id)
-            rule["id"] = self.rule_id
+            # Fill in a copy, the coordinator's rule dicts are shared and read-only
+            self.rule = {**self.rule, "id": self.rule_id}
             
         # Get device GID, using the one from device_info if missing in rule
         if "gid" in rule:
             self.device_gid = rule["gid"]
         else:
             self.device_gid = device_data.get("gid", "unknown")
-            rule["gid"] = self.device_gid
+            self.rule = {**self.rule, "gid": self.device_gid}
             _LOGGER.warning("Rule missing GID, using device GID: %s", self.device_gid)
             
         # Create a unique ID based on the rule ID itself
         # Replace hyphens with underscores for entity ID compatibility
-        safe_rule_id = self.rule_id.replace("-", "_")
+        safe_rule_id = self.rule_id.translate(_SAFE_ID_TRANS)
         self._attr_unique_id = f"{self.device_gid}_{ENTITY_RULE}_{safe_rule_id}"
         
         # Set device info
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, self.device_gid)},
-            name=device_data.get("name", "Firewalla"),
-            manufacturer="Firewalla",
-            model=device_data.get("model", "").capitalize(),
-            sw_version=device_data.get("version", ""),
-            configuration_url=f"https://my.firewalla.com/app/box/{self.device_gid}",
+        self._attr_device_info = box_device_info(
+            self.device_gid,
+            device_data.get("name", "Firewalla"),
+            device_data.get("model", ""),
+            device_data.get("version", ""),
         )
     
     def get_rule_data(self) -> Optional[Dict[str, Any]]:
         """Get the current rule data from coordinator."""
-        if not self.coordinator.data or "rules" not in self.coordinator.data:
+        if not self.coordinator.data:
             return None
             
-        for rule in self.coordinator.data["rules"]:
-            if isinstance(rule, dict) and rule.get("id") == self.rule_id:
-                return rule
-                
-        return None
+        return self.coordinator.data.get("rules_by_id", {}).get(self.rule_id)
     
     def get_device_data(self) -> Optional[Dict[str, Any]]:
         """Get the current device data from coordinator."""
-        if not self.coordinator.data or "devices" not in self.coordinator.data:
+        if not self.coordinator.data:
             return None
             
-        for device in self.coordinator.data["devices"]:
-            if device["gid"] == self.device_gid:
-                return device
-                
-        return None
+        return self.coordinator.data.get("devices_by_gid", {}).get(self.device_gid)
         
     @property
     def available(self) -> bool:
         """Return if the entity is available."""
-        if not self.coordinator.last_update_success:
-            return False
-            
-        # Check if device is still available and online
-        device_data = self.get_device_data()
-        if not device_data or not device_data.get("online", False):
+        if not self.coordinator.last_update_success or not self.coordinator.data:
             return False
             
         # For rules, we consider them available as long as the device is online
         # even if the rule is temporarily not returned by the API
-        return True
\ No newline at end of file
+        return self.device_gid in self.coordinator.data["online_gids"]
\ No newline at end of file
@@ -1,6 +1,5 @@
 """Logging utilities for Firewalla integration."""
 import logging
-from typing import Any, Callable, Optional
 
 # Create a module level logger
 _LOGGER = logging.getLogger(__name__)
@@ -46,15 +45,3 @@ def log_api_error(
         response_text
     )
 
-
-def create_device_entity_logger(device_name: str, entity_type: str) -> Callable:
-    """Create a logger function for device entities.
-    
-    Returns a function that can be used to log messages with device context.
-    """
-    def log_func(logger: logging.Logger, message: str, *args: Any, 
-                level: int = logging.INFO) -> None:
-        """Log a message with device context."""
-        logger.log(level, f"[{device_name}] [{entity_type}] {message}", *args)
-    
-    return log_func
\ No newline at end of file
@@ -2,8 +2,8 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -11,12 +11,9 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import (
-    UnitOfDataRate,
-    UnitOfInformation,
-)
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+from homeassistant.const import UnitOfInformation
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
@@ -25,6 +22,12 @@ from homeassistant.helpers.update_coordinator import (
 from .const import (
     DOMAIN,
     FIREWALLA_COORDINATOR,
+    FIREWALLA_NETWORK_COORDINATOR,
+)
+from .entity_base import (
+    WriteOnChangeMixin,
+    network_device_info,
+    timestamp_to_iso,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -38,77 +41,44 @@ async def async_setup_entry(
     """Set up Firewalla network device sensors."""
     _LOGGER.debug("Setting up network device sensors directly")
     
-    coordinator = hass.data[DOMAIN][entry.entry_id][FIREWALLA_COORDINATOR]
+    device_coordinator = hass.data[DOMAIN][entry.entry_id][FIREWALLA_COORDINATOR]
+    coordinator = hass.data[DOMAIN][entry.entry_id][FIREWALLA_NETWORK_COORDINATOR]
     
     if not coordinator.data or "network_devices" not in coordinator.data:
         _LOGGER.warning("No network device data available yet")
         return
     
-    _LOGGER.debug("Found %d network devices", 
-                 len(coordinator.data["network_devices"]) if isinstance(coordinator.data["network_devices"], list) else 0)
-    
-    entities = []
-    
-    # Create a mapping of device GIDs to device info
-    firewalla_devices = {}
-    if "devices" in coordinator.data:
-        for device in coordinator.data["devices"]:
-            if isinstance(device, dict) and "gid" in device:
-                firewalla_devices[device["gid"]] = device
+    _LOGGER.debug("Found %d network devices", len(coordinator.data["network_devices"]))
+    
+    # Map device GIDs to device info
+    firewalla_devices = (
+        device_coordinator.data["devices_by_gid"] if device_coordinator.data else {}
+    )
+    
+    # Only devices with an ID that belong to a known box get sensors
+    network_devices = coordinator.data["network_devices"]
+    valid_devices = [
+        device
+        for device in network_devices
+        if device.get("id")
+        and device.get("gid") in firewalla_devices
+    ]
+    if len(valid_devices) != len(network_devices):
+        _LOGGER.warning(
+            "Skipping %d network devices without an ID or a known GID",
+            len(network_devices) - len(valid_devices),
+        )
     
-    # Create sensors for each network device
-    for device in coordinator.data["network_devices"]:
-        # Ensure device data is a dictionary
-        if not isinstance(device, dict):
-            _LOGGER.warning("Network device is not a dictionary: %s", type(device))
-            continue
-            
-        # Skip devices without an ID
-        device_id = device.get("id")
-        if not device_id:
-            _LOGGER.warning("Network device missing ID")
-            continue
-            
-        _LOGGER.debug("Processing network device: %s", device_id)
-            
-        device_gid = device.get("gid")
-        if not device_gid or device_gid not in firewalla_devices:
-            _LOGGER.warning("Network device has invalid GID: %s", device_gid)
-            continue
-            
-        firewalla_device = firewalla_devices[device_gid]
-        firewalla_name = firewalla_device.get("name", "Firewalla")
-        
-        try:
-            # Network device online status
-            entities.append(
-                NetworkDeviceOnlineSensor(
-                    coordinator=coordinator,
-                    device_data=device,
-                    firewalla_name=firewalla_name,
-                )
-            )
-            
-            # Download data sensor
-            entities.append(
-                NetworkDeviceDownloadSensor(
-                    coordinator=coordinator,
-                    device_data=device,
-                    firewalla_name=firewalla_name,
-                )
-            )
-            
-            # Upload data sensor
-            entities.append(
-                NetworkDeviceUploadSensor(
-                    coordinator=coordinator,
-                    device_data=device,
-                    firewalla_name=firewalla_name,
-                )
-            )
-            
-        except Exception as ex:
-            _LOGGER.error("Error creating network device sensor: %s - %s", device_id, ex)
+    entities = [
+        NetworkDeviceSensor(
+            coordinator=coordinator,
+            device_data=device,
+            firewalla_name=firewalla_devices[device["gid"]].get("name", "Firewalla"),
+            sensor_def=sensor_def,
+        )
+        for device in valid_devices
+        for sensor_def in NETWORK_DEVICE_SENSORS
+    ]
     
     _LOGGER.debug("Adding %d network device entities", len(entities))
     if entities:
@@ -117,46 +87,117 @@ async def async_setup_entry(
         _LOGGER.warning("No network device entities were created")
 
 
+@dataclass(frozen=True)
+class NetworkDeviceSensorDef:
+    """Description of a sensor created for every network device."""
+
+    suffix: str  # Appended to the device ID for the unique ID
+    name: str
+    icon: str
+    device_class: SensorDeviceClass
+    value_fn: Callable[[Optional[Dict[str, Any]]], Any]
+    state_class: Optional[SensorStateClass] = None
+    unit: Optional[str] = None
+    options: Optional[List[str]] = None
+
+
+NETWORK_DEVICE_SENSORS = (
+    NetworkDeviceSensorDef(
+        suffix="online",
+        name="Status",
+        icon="mdi:lan-connect",
+        device_class=SensorDeviceClass.ENUM,
+        value_fn=lambda device: (
+            "online" if device and device.get("online", False) else "offline"
+        ),
+        options=["online", "offline"],
+    ),
+    NetworkDeviceSensorDef(
+        suffix="download",
+        name="Download",
+        icon="mdi:download",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        value_fn=lambda device: device.get("totalDownload", 0) if device else 0,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        unit=UnitOfInformation.BYTES,
+    ),
+    NetworkDeviceSensorDef(
+        suffix="upload",
+        name="Upload",
+        icon="mdi:upload",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        value_fn=lambda device: device.get("totalUpload", 0) if device else 0,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        unit=UnitOfInformation.BYTES,
+    ),
+)
+
 
-class NetworkDeviceBaseSensor(CoordinatorEntity, SensorEntity):
-    """Base class for network device sensors."""
+class NetworkDeviceSensor(WriteOnChangeMixin, CoordinatorEntity, SensorEntity):
+    """Sensor for one value of a network device, described by a definition."""
 
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     
-    def __init__(self, coordinator, device_data, firewalla_name):
+    def __init__(self, coordinator, device_data, firewalla_name, sensor_def):
         """Initialize the sensor."""
         super().__init__(coordinator)
         self.device_data = device_data
         self.device_id = device_data["id"]
         self.gid = device_data["gid"]
         self.firewalla_name = firewalla_name
+        self.sensor_def = sensor_def
         
-        # Generate a safe ID by replacing invalid characters
-        safe_id = self.device_id.replace(":", "_").replace(".", "_")
+        device_name = device_data.get("name", self.device_id)
+        self._attr_unique_id = f"{self.device_id}_{sensor_def.suffix}"
+        self._attr_name = f"{device_name} {sensor_def.name}"
+        self._attr_icon = sensor_def.icon
+        self._attr_device_class = sensor_def.device_class
+        self._attr_state_class = sensor_def.state_class
+        self._attr_native_unit_of_measurement = sensor_def.unit
+        self._attr_options = sensor_def.options
         
         # Set up common attributes
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, self.device_id)},
-            name=device_data.get("name", self.device_id),
-            manufacturer=device_data.get("macVendor", "Unknown"),
-            via_device=(DOMAIN, self.gid),
-            model="Network Device",
+        self._attr_device_info = network_device_info(
+            self.device_id,
+            device_name,
+            device_data.get("macVendor", "Unknown"),
+            self.gid,
+        )
+        # Attributes built from the device dict they were last computed for,
+        # seeded now so the first state write finds them cached
+        self._attributes_source: Optional[Dict[str, Any]] = device_data
+        self._attributes: Dict[str, Any] = self._build_attributes(device_data)
+        self._attr_native_value = sensor_def.value_fn(device_data)
+    
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update the value once per coordinator refresh."""
+        self._attr_native_value = self.sensor_def.value_fn(
+            self.get_network_device_data()
         )
+        super()._handle_coordinator_update()
+    
+    def get_network_device_data(self) -> Optional[Dict[str, Any]]:
+        """Get the current network device data from coordinator."""
+        if not self.coordinator.data:
+            return None
+            
+        return self.coordinator.data["network_devices_by_id"].get(self.device_id)
     
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Return extra attributes."""
-        # Find current device data
-        current_device = None
-        if self.coordinator.data and "network_devices" in self.coordinator.data:
-            for device in self.coordinator.data["network_devices"]:
-                if device.get("id") == self.device_id:
-                    current_device = device
-                    break
-        
-        if not current_device:
-            current_device = self.device_data
+        current_device = self.get_network_device_data() or self.device_data
         
+        # Device dicts are replaced, never mutated, so identity tracks changes
+        if current_device is not self._attributes_source:
+            self._attributes = self._build_attributes(current_device)
+            self._attributes_source = current_device
+            
+        return self._attributes
+    
+    def _build_attributes(self, current_device: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the attributes for the given network device data."""
         attributes = {
             "ip": current_device.get("ip", ""),
             "mac": self.device_id.replace("mac:", ""),
@@ -176,9 +217,9 @@ class NetworkDeviceBaseSensor(CoordinatorEntity, SensorEntity):
         # Add last seen timestamp in ISO format
         if "lastSeen" in current_device:
             try:
-                last_seen = float(current_device["lastSeen"])
-                last_seen_iso = datetime.fromtimestamp(last_seen).isoformat()
-                attributes["last_seen"] = last_seen_iso
+                attributes["last_seen"] = timestamp_to_iso(
+                    float(current_device["lastSeen"])
+                )
             except (ValueError, TypeError):
                 attributes["last_seen"] = current_device["lastSeen"]
         
@@ -191,86 +232,7 @@ class NetworkDeviceBaseSensor(CoordinatorEntity, SensorEntity):
     @property
     def available(self) -> bool:
         """Return if entity is available."""
-        if not self.coordinator.last_update_success:
+        if not self.coordinator.last_update_success or not self.coordinator.data:
             return False
             
-        if self.coordinator.data and "network_devices" in self.coordinator.data:
-            for device in self.coordinator.data["network_devices"]:
-                if device.get("id") == self.device_id:
-                    return True
-        
-        return False
-
-
-class NetworkDeviceOnlineSensor(NetworkDeviceBaseSensor):
-    """Sensor for network device online status."""
-    
-    _attr_icon = "mdi:lan-connect"
-    _attr_device_class = SensorDeviceClass.ENUM
-    _attr_options = ["online", "offline"]
-    
-    def __init__(self, coordinator, device_data, firewalla_name):
-        """Initialize the sensor."""
-        super().__init__(coordinator, device_data, firewalla_name)
-        self._attr_unique_id = f"{self.device_id}_online"
-        self._attr_name = f"{device_data.get('name', self.device_id)} Status"
-    
-    @property
-    def native_value(self) -> str:
-        """Return the online status."""
-        if self.coordinator.data and "network_devices" in self.coordinator.data:
-            for device in self.coordinator.data["network_devices"]:
-                if device.get("id") == self.device_id:
-                    return "online" if device.get("online", False) else "offline"
-        
-        return "offline"
-
-
-class NetworkDeviceDownloadSensor(NetworkDeviceBaseSensor):
-    """Sensor for network device download data."""
-    
-    _attr_icon = "mdi:download"
-    _attr_device_class = SensorDeviceClass.DATA_SIZE
-    _attr_state_class = SensorStateClass.TOTAL_INCREASING
-    _attr_native_unit_of_measurement = UnitOfInformation.BYTES
-    
-    def __init__(self, coordinator, device_data, firewalla_name):
-        """Initialize the sensor."""
-        super().__init__(coordinator, device_data, firewalla_name)
-        self._attr_unique_id = f"{self.device_id}_download"
-        self._attr_name = f"{device_data.get('name', self.device_id)} Download"
-    
-    @property
-    def native_value(self) -> int:
-        """Return the download data."""
-        if self.coordinator.data and "network_devices" in self.coordinator.data:
-            for device in self.coordinator.data["network_devices"]:
-                if device.get("id") == self.device_id:
-                    return device.get("totalDownload", 0)
-        
-        return 0
-
-
-class NetworkDeviceUploadSensor(NetworkDeviceBaseSensor):
-    """Sensor for network device upload data."""
-    
-    _attr_icon = "mdi:upload"
-    _attr_device_class = SensorDeviceClass.DATA_SIZE
-    _attr_state_class = SensorStateClass.TOTAL_INCREASING
-    _attr_native_unit_of_measurement = UnitOfInformation.BYTES
-    
-    def __init__(self, coordinator, device_data, firewalla_name):
-        """Initialize the sensor."""
-        super().__init__(coordinator, device_data, firewalla_name)
-        self._attr_unique_id = f"{self.device_id}_upload"
-        self._attr_name = f"{device_data.get('name', self.device_id)} Upload"
-    
-    @property
-    def native_value(self) -> int:
-        """Return the upload data."""
-        if self.coordinator.data and "network_devices" in self.coordinator.data:
-            for device in self.coordinator.data["network_devices"]:
-                if device.get("id") == self.device_id:
-                    return device.get("totalUpload", 0)
-        
-        return 0
+        return self.device_id in self.coordinator.data["known_network_ids"]
@@ -2,16 +2,15 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
 
 from homeassistant.components.sensor import (
-    SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
@@ -41,44 +40,14 @@ async def async_setup_entry(
         _LOGGER.error("No devices data available in coordinator")
         return
     
-    entities = []
-    
     # Log the data structure for debugging
     _LOGGER.debug("Devices data structure: %s", coordinator.data["devices"])
     
-    for device_data in coordinator.data["devices"]:
-        # Ensure device_data is a dictionary
-        if not isinstance(device_data, dict):
-            _LOGGER.error("Unexpected device data format: %s", type(device_data))
-            continue
-            
-        try:
-            # Add device count sensor
-            entities.append(
-                FirewallaDeviceCountSensor(
-                    coordinator=coordinator,
-                    device_data=device_data,
-                )
-            )
-            
-            # Add rule count sensor
-            entities.append(
-                FirewallaRuleCountSensor(
-                    coordinator=coordinator,
-                    device_data=device_data,
-                )
-            )
-            
-            # Add alarm count sensor
-            entities.append(
-                FirewallaAlarmCountSensor(
-                    coordinator=coordinator,
-                    device_data=device_data,
-                )
-            )
-        except Exception as ex:
-            _LOGGER.error("Error creating sensor for device %s: %s", 
-                         device_data.get("name", "unknown"), ex)
+    entities = [
+        FirewallaCountSensor(coordinator, device_data, description)
+        for device_data in coordinator.data["devices"]
+        for description in COUNT_SENSORS
+    ]
 
     _LOGGER.info("Adding %d firewalla sensor entities", len(entities))
     async_add_entities(entities)
@@ -88,75 +57,63 @@ async def async_setup_entry(
 
 
 
-class FirewallaBaseSensor(FirewallaBaseEntity, SensorEntity):
-    """Base class for Firewalla sensors."""
-
-    async def async_update(self) -> None:
-        """Update the sensor."""
-        await self.coordinator.async_request_refresh()
-
-
-class FirewallaDeviceCountSensor(FirewallaBaseSensor):
-    """Representation of a Firewalla device count sensor."""
-
-    _attr_native_unit_of_measurement = "devices"
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_icon = "mdi:devices"
-
-    def __init__(self, coordinator, device_data):
-        """Initialize the sensor."""
-        super().__init__(coordinator, device_data)
-        self._attr_unique_id = f"{self.gid}_{ENTITY_DEVICE_COUNT}"
-        self._attr_name = f"{device_data['name']} Device Count"
-
-    @property
-    def native_value(self) -> int:
-        """Return the device count."""
-        device_data = self.get_device_data()
-        if device_data:
-            return device_data.get("deviceCount", 0)
-        return 0
-
-
-class FirewallaRuleCountSensor(FirewallaBaseSensor):
-    """Representation of a Firewalla rule count sensor."""
-
-    _attr_native_unit_of_measurement = "rules"
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_icon = "mdi:shield"
-
-    def __init__(self, coordinator, device_data):
-        """Initialize the sensor."""
-        super().__init__(coordinator, device_data)
-        self._attr_unique_id = f"{self.gid}_{ENTITY_RULE_COUNT}"
-        self._attr_name = f"{device_data['name']} Rule Count"
-
-    @property
-    def native_value(self) -> int:
-        """Return the rule count."""
-        device_data = self.get_device_data()
-        if device_data:
-            return device_data.get("ruleCount", 0)
-        return 0
+@dataclass(frozen=True, kw_only=True)
+class FirewallaCountSensorDescription(SensorEntityDescription):
+    """Description of a count sensor created for every box."""
+
+    # Key of the box data field holding the sensor's value
+    value_key: str
+
+
+# The description key is the unique ID suffix, kept from the old per-count classes
+COUNT_SENSORS = (
+    FirewallaCountSensorDescription(
+        key=ENTITY_DEVICE_COUNT,
+        name="Device Count",
+        value_key="deviceCount",
+        native_unit_of_measurement="devices",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:devices",
+    ),
+    FirewallaCountSensorDescription(
+        key=ENTITY_RULE_COUNT,
+        name="Rule Count",
+        value_key="ruleCount",
+        native_unit_of_measurement="rules",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:shield",
+    ),
+    FirewallaCountSensorDescription(
+        key=ENTITY_ALARM_COUNT,
+        name="Alarm Count",
+        value_key="alarmCount",
+        native_unit_of_measurement="alarms",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:alarm-light",
+    ),
+)
 
 
-class FirewallaAlarmCountSensor(FirewallaBaseSensor):
-    """Representation of a Firewalla alarm count sensor."""
+class FirewallaCountSensor(FirewallaBaseEntity, SensorEntity):
+    """Sensor reporting one count from the box data, described by a description."""
 
-    _attr_native_unit_of_measurement = "alarms"
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_icon = "mdi:alarm-light"
+    entity_description: FirewallaCountSensorDescription
 
-    def __init__(self, coordinator, device_data):
+    def __init__(self, coordinator, device_data, description):
         """Initialize the sensor."""
         super().__init__(coordinator, device_data)
-        self._attr_unique_id = f"{self.gid}_{ENTITY_ALARM_COUNT}"
-        self._attr_name = f"{device_data['name']} Alarm Count"
-
-    @property
-    def native_value(self) -> int:
-        """Return the alarm count."""
+        self.entity_description = description
+        self._attr_unique_id = f"{self.gid}_{description.key}"
+        self._attr_name = f"{device_data['name']} {description.name}"
+        self._attr_native_value = device_data.get(description.value_key, 0)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update the value once per coordinator refresh."""
         device_data = self.get_device_data()
-        if device_data:
-            return device_data.get("alarmCount", 0)
-        return 0
+        self._attr_native_value = (
+            device_data.get(self.entity_description.value_key, 0)
+            if device_data
+            else 0
+        )
+        super()._handle_coordinator_update()
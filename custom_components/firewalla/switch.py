@@ -2,16 +2,14 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from homeassistant.components.switch import SwitchEntity, SwitchDeviceClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .entity_base import FirewallaBaseEntity, FirewallaRuleEntity
+from .entity_base import FirewallaRuleEntity, timestamp_to_iso
 
 from .const import (
     ATTR_GID,
@@ -20,11 +18,9 @@ from .const import (
     ATTR_RULE_DISABLED,
     ATTR_RULE_ID,
     ATTR_RULE_NOTES,
-    ATTR_RULE_TARGET,
-    ATTR_RULE_TYPE,
     DOMAIN,
-    ENTITY_RULE,
     FIREWALLA_COORDINATOR,
+    FIREWALLA_NETWORK_COORDINATOR,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -37,6 +33,7 @@ async def async_setup_entry(
 ) -> None:
     """Set up Firewalla switch entries."""
     coordinator = hass.data[DOMAIN][entry.entry_id][FIREWALLA_COORDINATOR]
+    network_coordinator = hass.data[DOMAIN][entry.entry_id][FIREWALLA_NETWORK_COORDINATOR]
     
     # Ensure we have rules data
     if not coordinator.data:
@@ -48,52 +45,86 @@ async def async_setup_entry(
         return
     
     # Log the data structure for debugging
-    _LOGGER.debug("Rules data available: %d rules", 
-                 len(coordinator.data["rules"]) if isinstance(coordinator.data["rules"], list) else 0)
+    _LOGGER.debug("Rules data available: %d rules", len(coordinator.data["rules"]))
     
-    # Create a mapping of device GIDs to device info
-    device_mapping = {}
-    if "devices" in coordinator.data and isinstance(coordinator.data["devices"], list):
-        for device in coordinator.data["devices"]:
-            if isinstance(device, dict) and "gid" in device:
-                device_mapping[device["gid"]] = device
+    # Boxes indexed by GID, built by the coordinator
+    device_mapping = coordinator.data["devices_by_gid"]
     
-    entities = []
+    # Only rules that belong to a known box get a switch
+    active_rules = coordinator.data["active_rules"]
+    valid_rules = [rule for rule in active_rules if rule.get("gid") in device_mapping]
+    if len(valid_rules) != len(active_rules):
+        _LOGGER.warning(
+            "Skipping %d rules without a GID or a known device",
+            len(active_rules) - len(valid_rules),
+        )
     
-    # Create switch entities for each rule
-    for rule in coordinator.data["rules"]:
-        # Ensure rule is a dictionary
-        if not isinstance(rule, dict):
-            _LOGGER.error("Unexpected rule data format: %s", type(rule))
-            continue
-            
-        # Skip disabled rules
-        if not isinstance(rule, dict) or rule.get("disabled", False):
-            continue
-            
-        # Get the device info for this rule
-        device_gid = rule.get("gid")
-        if not device_gid or device_gid not in device_mapping:
-            _LOGGER.warning("Rule has no device GID or device not found: %s", rule.get("id", "unknown"))
-            continue
-            
-        device_info = device_mapping[device_gid]
-        
-        try:
-            entities.append(
-                FirewallaRuleSwitch(
-                    coordinator=coordinator,
-                    rule=rule,
-                    device_info=device_info,
-                )
-            )
-        except Exception as ex:
-            _LOGGER.error("Error creating FirewallaRuleSwitch: %s", ex)
+    entities = [
+        FirewallaRuleSwitch(
+            coordinator=coordinator,
+            rule=rule,
+            device_info=device_mapping[rule["gid"]],
+            network_coordinator=network_coordinator,
+        )
+        for rule in valid_rules
+    ]
 
     _LOGGER.info("Adding %d rule switch entities", len(entities))
     async_add_entities(entities)
 
 
+# Switch icon for each rule action, other actions get the default shield
+_ACTION_ICONS = {
+    "allow": "mdi:checkbox-multiple-marked-circle",
+    "block": "mdi:block-helper",
+    "deny": "mdi:block-helper",
+    "timelimit": "mdi:clock",
+}
+
+
+def _build_rule_display(rule: Dict[str, Any], group_name: str) -> Tuple[str, str]:
+    """Return the switch name and icon for a rule in one pass over it."""
+    # Determine icon based on action (allow/block)
+    icon = _ACTION_ICONS.get((rule.get("action") or "").lower(), "mdi:shield")
+    
+    # Get target value if it's a dictionary
+    rule_target = rule.get("target", "unknown")
+    target_type = ""
+    if isinstance(rule_target, dict):
+        target_value = rule_target.get("value", "unknown")
+        target_type = rule_target.get("type", "")
+        if target_type and target_value:
+            target_str = f"{target_type}: {target_value}"
+        else:
+            target_str = str(target_value)
+    else:
+        target_str = str(rule_target)
+        
+    # Create name with the most descriptive information available,
+    # group first, then notes if available, otherwise target info
+    name_parts = []
+    if group_name:
+        name_parts.append(f"group: {group_name}")
+        
+    rule_notes = rule.get("notes", "")
+    if rule_notes:
+        name_parts.append(str(rule_notes))
+    elif target_type == "category":
+        name_parts.append(f"category: {target_value}")
+    elif target_str and target_str != "unknown":
+        name_parts.append(target_str)
+        
+    return f"Rule: {' - '.join(name_parts)}", icon
+
+
+def _compute_on(rule: Dict[str, Any]) -> bool:
+    """Return true if the rule is active (not paused)."""
+    # The status field is what the API uses, paused is the older flag
+    if "status" in rule:
+        return rule["status"] != "paused"
+    return not rule.get("paused", False)
+
+
 class FirewallaRuleSwitch(FirewallaRuleEntity, SwitchEntity):
     """Representation of a Firewalla rule switch."""
     
@@ -101,116 +132,74 @@ class FirewallaRuleSwitch(FirewallaRuleEntity, SwitchEntity):
     _attr_device_class = SwitchDeviceClass.SWITCH
     _attr_has_entity_name = True
 
-    def __init__(self, coordinator, rule, device_info):
+    def __init__(self, coordinator, rule, device_info, network_coordinator):
         """Initialize the switch."""
         super().__init__(coordinator, rule, device_info)
+        # Group names come from the slower network devices coordinator
+        self.network_coordinator = network_coordinator
+        # Attributes built from the rule dict and group names they were last
+        # computed for
+        self._attributes_source: Optional[Dict[str, Any]] = None
+        self._groups_source: Optional[Dict[str, Any]] = None
+        self._attributes: Dict[str, Any] = {}
         
-        # Determine icon based on action (allow/block)
-        action = rule.get("action", "").lower()
-        if action == "allow":
-            self._attr_icon = "mdi:checkbox-multiple-marked-circle"
-        elif action == "block" or action == "deny":
-            self._attr_icon = "mdi:block-helper"
-        elif action == "timelimit":
-            self._attr_icon = "mdi:clock"
-        else:
-            self._attr_icon = "mdi:shield"
-        
-        # Create a descriptive name based on the rule notes, group, or type and target
-        rule_type = rule.get("type", "unknown")
-        rule_target = rule.get("target", "unknown")
-        
-        # Get target value if it's a dictionary
-        if isinstance(rule_target, dict):
-            target_value = rule_target.get("value", "unknown")
-            target_type = rule_target.get("type", "")
-            if target_type and target_value:
-                target_str = f"{target_type}: {target_value}"
-            else:
-                target_str = target_value
-        else:
-            target_str = str(rule_target)
+        # Name from the rule notes, group, or target, icon from the action
+        self._attr_name, self._attr_icon = _build_rule_display(
+            rule, self._group_name(rule)
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Also follow the network devices coordinator for group names."""
+        await super().async_added_to_hass()
+        # Subscribing also keeps that coordinator polling
+        self.async_on_remove(
+            self.network_coordinator.async_add_listener(
+                self._handle_coordinator_update
+            )
+        )
+
+    def _group_name(self, rule: Dict[str, Any]) -> str:
+        """Return the name of the device group the rule is scoped to, if any."""
+        scope = rule.get("scope")
+        if not isinstance(scope, dict) or scope.get("type") != "group":
+            return ""
             
-        # Get notes and group information
-        rule_notes = rule.get("notes", "")
-        device_name = device_info.get("name", "Firewalla")
-        
-        # Check for group name in scope
-        group_name = ""
-        scope = rule.get("scope", {})
-        if isinstance(scope, dict) and scope.get("type") == "group":
-            group_id = scope.get("value")
-            if group_id and coordinator.data and "device_groups" in coordinator.data:
-                group_name = coordinator.data["device_groups"].get(group_id, "")
-        
-        # Create name with the most descriptive information available
-        name_parts = []
-        
-        # Add notes if available, otherwise use target info
-        if rule_notes:
-            name_parts.append(rule_notes)
-        else:
-            if target_type == "category":
-                name_parts.append(f"category: {target_value}")
-            elif target_str and target_str != "unknown":
-                name_parts.append(target_str)
-        
-        # Add group name if available
-        if group_name:
-            name_parts.insert(0, f"group: {group_name}")
+        group_id = scope.get("value")
+        if not group_id or not self.network_coordinator.data:
+            return ""
             
-        # Construct final name
-        name = " - ".join(name_parts)
-        self._attr_name = f"Rule: {name}"
-        
-        # Set device info
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, self.device_gid)},
-            name=device_info.get("name", "Firewalla"),
-            manufacturer="Firewalla",
-            model=device_info.get("model", "").capitalize(),
-            sw_version=device_info.get("version", ""),
-            configuration_url=f"https://my.firewalla.com/app/box/{self.device_gid}",
-        )
+        return self.network_coordinator.data["device_groups"].get(group_id, "")
 
     @property
     def is_on(self) -> bool:
         """Return true if the rule is active (not paused)."""
-        # First, check if there's an updated version of the rule in current data
-        current_rule = self.get_rule_data()
-        
-        if current_rule:
-            # Check the status field first (seems to be what the API uses)
-            if "status" in current_rule:
-                rule_status = current_rule["status"]
-                _LOGGER.debug("Rule %s has status: %s", self.rule_id, rule_status)
-                return rule_status != "paused"
-            
-            # Fallback to paused field
-            return not current_rule.get("paused", False)
-        else:
-            # Fall back to the original rule data if not found in current data
-            if "status" in self.rule:
-                rule_status = self.rule["status"]
-                _LOGGER.debug("Using original rule status for %s: %s", self.rule_id, rule_status)
-                return rule_status != "paused"
-            return not self.rule.get("paused", False)
-            
-
+        # Fall back to the original rule data if not found in current data
+        return _compute_on(self.get_rule_data() or self.rule)
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Return additional attributes about the rule."""
         # Find the current rule data
-        current_rule = self.get_rule_data()
-                
-        if not current_rule:
-            current_rule = self.rule
+        current_rule = self.get_rule_data() or self.rule
+        groups_source = self.network_coordinator.data
+        
+        # Rule dicts are replaced, never mutated, on refresh and on toggle
+        if (
+            current_rule is not self._attributes_source
+            or groups_source is not self._groups_source
+        ):
+            self._attributes = self._build_attributes(current_rule)
+            self._attributes_source = current_rule
+            self._groups_source = groups_source
             
+        return self._attributes
+
+    def _build_attributes(self, current_rule: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the attributes for the given rule data."""
         attributes = {
             ATTR_RULE_ID: current_rule.get("id", "unknown"),
             ATTR_GID: current_rule.get("gid", "unknown"),
-            "status": "active" if self.is_on else "paused",
+            "status": "active" if _compute_on(current_rule) else "paused",
         }
         
         # Add MSP link to the rule
@@ -248,11 +237,12 @@ class FirewallaRuleSwitch(FirewallaRuleEntity, SwitchEntity):
             if scope_value:
                 attributes["scope_value"] = scope_value
                 
-            # If the scope is a group, add the group name
-            if scope_type == "group" and scope_value and self.coordinator.data and "device_groups" in self.coordinator.data:
-                group_name = self.coordinator.data["device_groups"].get(scope_value)
-                if group_name:
-                    attributes["group_name"] = group_name
+            # If the scope is a group, add its current name. The switch listens
+            # to the network coordinator, so a group that appears or is renamed
+            # shows up after its next poll; the switch name keeps the setup one.
+            group_name = self._group_name(current_rule)
+            if group_name:
+                attributes["group_name"] = group_name
         
         # Add direction if available
         if "direction" in current_rule:
@@ -267,23 +257,15 @@ class FirewallaRuleSwitch(FirewallaRuleEntity, SwitchEntity):
             attributes[ATTR_RULE_NOTES] = current_rule["notes"]
             
         # Add timestamps in ISO 8601 format
-        from datetime import datetime
-        
-        if "ts" in current_rule and current_rule["ts"]:
-            try:
-                created_at = datetime.fromtimestamp(current_rule["ts"]).isoformat()
-                attributes["created_at"] = created_at
-            except (ValueError, TypeError):
-                # Keep original value if conversion fails
-                attributes["created_at"] = current_rule["ts"]
-                
-        if "updateTs" in current_rule and current_rule["updateTs"]:
+        for key, attr in (("ts", "created_at"), ("updateTs", "updated_at")):
+            timestamp = current_rule.get(key)
+            if not timestamp:
+                continue
             try:
-                updated_at = datetime.fromtimestamp(current_rule["updateTs"]).isoformat()
-                attributes["updated_at"] = updated_at
-            except (ValueError, TypeError):
+                attributes[attr] = timestamp_to_iso(timestamp)
+            except (ValueError, TypeError, OverflowError, OSError):
                 # Keep original value if conversion fails
-                attributes["updated_at"] = current_rule["updateTs"]
+                attributes[attr] = timestamp
                 
         if "createdAt" in current_rule:
             # This might already be in a different format, so keep as is
@@ -297,21 +279,15 @@ class FirewallaRuleSwitch(FirewallaRuleEntity, SwitchEntity):
         success = await self.coordinator.api.resume_rule(self.rule_id)
         
         if success:
+            # Nothing to update if the rule was already active
+            if self.is_on:
+                return
+                
             # Update local state immediately for faster UI feedback
-            current_rule = self.get_rule_data()
-            if current_rule:
-                current_rule["status"] = "active"  # Set status directly
-                current_rule["paused"] = False     # Also set paused for backward compatibility
-            
-            # Also update our cached rule
-            self.rule["status"] = "active"
-            self.rule["paused"] = False
-            
-            # Force state update
-            self.async_write_ha_state()
+            self.coordinator.async_set_rule_paused(self.rule_id, False)
             
-            # Then refresh data from API
-            await self.coordinator.async_request_refresh()
+            # Confirm against the API once a burst of toggles has settled
+            self.coordinator.async_request_delayed_refresh()
         else:
             _LOGGER.error("Failed to resume rule: %s", self.rule_id)
 
@@ -321,21 +297,15 @@ class FirewallaRuleSwitch(FirewallaRuleEntity, SwitchEntity):
         success = await self.coordinator.api.pause_rule(self.rule_id)
         
         if success:
+            # Nothing to update if the rule was already paused
+            if not self.is_on:
+                return
+                
             # Update local state immediately for faster UI feedback
-            current_rule = self.get_rule_data()
-            if current_rule:
-                current_rule["status"] = "paused"  # Set status directly
-                current_rule["paused"] = True      # Also set paused for backward compatibility
-            
-            # Also update our cached rule
-            self.rule["status"] = "paused"
-            self.rule["paused"] = True
-            
-            # Force state update
-            self.async_write_ha_state()
+            self.coordinator.async_set_rule_paused(self.rule_id, True)
             
-            # Then refresh data from API
-            await self.coordinator.async_request_refresh()
+            # Confirm against the API once a burst of toggles has settled
+            self.coordinator.async_request_delayed_refresh()
         else:
             _LOGGER.error("Failed to pause rule: %s", self.rule_id)
 